@@ -6,11 +6,14 @@ import json
 import os
 import re
 import sys
-from dataclasses import asdict
-from typing import Iterable
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Iterable, TextIO
 
 from .feeds import (
     DEFAULT_SOURCES,
+    FeedItem,
     aggregate as aggregate_feeds,
     format_items_text as format_feed_items,
     load_sources_file,
@@ -20,6 +23,12 @@ from .feeds import (
 from . import store
 
 
+# Byte translate table: keep a-z0-9, map every other byte to "-"
+_SLUG_TABLE = bytes(c if (0x30 <= c <= 0x39 or 0x61 <= c <= 0x7A) else 0x2D for c in range(256))
+_SLUG_NONALNUM = re.compile(r"[^a-z0-9]+")
+
+
+@lru_cache(maxsize=1024)
 def slugify(text: str) -> str:
     """Convert text to a simple ASCII slug suitable for filenames/urls.
 
@@ -29,26 +38,49 @@ def slugify(text: str) -> str:
     - Collapse multiple dashes
     """
     text = text.lower()
-    # Replace non-letter/digit with dashes
-    text = re.sub(r"[^a-z0-9]+", "-", text)
-    # Collapse multiple dashes
-    text = re.sub(r"-+", "-", text)
-    # Trim dashes
-    return text.strip("-")
+    try:
+        raw = text.encode("ascii")
+    except UnicodeEncodeError:
+        raw = None
+    if raw is not None:
+        # ASCII fast path: one translate, then split/join collapses and trims dashes
+        return b"-".join(filter(None, raw.translate(_SLUG_TABLE).split(b"-"))).decode("ascii")
+    # Replace runs of non-letter/digit with a single dash, then trim
+    return _SLUG_NONALNUM.sub("-", text).strip("-")
 
 
 def sha256_file(path: str, chunk_size: int = 1024 * 1024) -> str:
     """Return hex sha256 of a file.
 
-    Reads in chunks to support large files without high memory use.
+    Reads in chunks into a reused buffer to support large files without
+    high memory use.
     """
-    h = hashlib.sha256()
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(chunk_size), b""):
-            h.update(chunk)
+        if sys.version_info >= (3, 11):
+            # The whole read/update loop runs in C
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        # Reuse one buffer instead of allocating new bytes on every read()
+        buf = bytearray(chunk_size)
+        mv = memoryview(buf)
+        while n := f.readinto(buf):
+            h.update(mv[:n])
     return h.hexdigest()
 
 
+def _openssl_sha256_available() -> bool:
+    """Return True if hashlib.sha256 is OpenSSL-backed (SHA-NI/ARMv8 accelerated)."""
+    try:
+        import _hashlib
+    except ImportError:
+        return False
+    return hashlib.sha256 is getattr(_hashlib, "openssl_sha256", None)
+
+
+if not _openssl_sha256_available():
+    warnings.warn("hashlib not using OpenSSL; SHA-NI acceleration unavailable", RuntimeWarning)
+
+
 def iter_existing_paths(paths: Iterable[str]) -> Iterable[str]:
     for p in paths:
         if os.path.exists(p):
@@ -68,15 +100,26 @@ def cmd_slug(args: argparse.Namespace) -> int:
     return 0
 
 
+def _safe_sha256(path: str) -> tuple[str, str | None, Exception | None]:
+    try:
+        return path, sha256_file(path), None
+    except Exception as exc:  # noqa: BLE001
+        return path, None, exc
+
+
 def cmd_hash(args: argparse.Namespace) -> int:
+    paths = list(iter_existing_paths(args.paths))
+    if not paths:
+        return 0
     code = 0
-    for path in iter_existing_paths(args.paths):
-        try:
-            digest = sha256_file(path)
-            print(f"{digest}  {path}")
-        except Exception as exc:  # noqa: BLE001
-            print(f"[error] 计算失败: {path} -> {exc}", file=sys.stderr)
-            code = 2
+    # sha256 在大块数据上会释放 GIL，多文件可用线程并发计算；结果按输入顺序输出
+    with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 4, len(paths))) as ex:
+        for path, digest, exc in ex.map(_safe_sha256, paths):
+            if exc is None:
+                print(f"{digest}  {path}")
+            else:
+                print(f"[error] 计算失败: {path} -> {exc}", file=sys.stderr)
+                code = 2
     return code
 
 
@@ -100,6 +143,25 @@ def _ensure_db_ready(db_path: str) -> store.sqlite3.Connection:
     return conn
 
 
+def _json_stream(items: Iterable[FeedItem], out: TextIO) -> None:
+    """逐条序列化并写出 JSON 数组，输出与 json.dumps(list, indent=2) 一致，但不构造完整列表与大字符串。"""
+    first = True
+    for i in items:
+        # FeedItem 字段均为扁平类型，直接构造 dict，省去 asdict 的递归深拷贝
+        d = {
+            "title": i.title,
+            "link": i.link,
+            "published": i.published.isoformat() if i.published else None,
+            "source": i.source,
+            "summary": i.summary,
+            "guid": i.guid,
+        }
+        out.write("[\n  " if first else ",\n  ")
+        out.write(json.dumps(d, ensure_ascii=False, indent=2).replace("\n", "\n  "))
+        first = False
+    out.write("[]\n" if first else "\n]\n")
+
+
 def cmd_feed_fetch(args: argparse.Namespace) -> int:
     # 优先：显式使用文件源
     if args.use_file or args.sources:
@@ -112,8 +174,7 @@ def cmd_feed_fetch(args: argparse.Namespace) -> int:
             limit=args.limit,
         )
         if args.json:
-            payload = [asdict(i) | {"published": (i.published.isoformat() if i.published else None)} for i in items]
-            print(json.dumps(payload, ensure_ascii=False, indent=2))
+            _json_stream(items, sys.stdout)
         else:
             print(format_feed_items(items))
         if not path:
@@ -128,12 +189,11 @@ def cmd_feed_fetch(args: argparse.Namespace) -> int:
     # 按分类过滤（如有）
     feed_ids = None
     if args.category:
-        feed_ids = [f.id for f in store.list_feeds(conn, active_only=True) if f.category == args.category]
+        feed_ids = store.list_feed_ids_by_category(conn, args.category, active_only=True)
     # 导出
     items = export_items_from_db(conn, since_hours=args.since, limit=args.limit, feed_ids=feed_ids)
     if args.json:
-        payload = [asdict(i) | {"published": (i.published.isoformat() if i.published else None)} for i in items]
-        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        _json_stream(items, sys.stdout)
     else:
         print(format_feed_items(items))
     return 0
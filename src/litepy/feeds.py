@@ -1,17 +1,58 @@
 from __future__ import annotations
 
+import atexit
 import email.utils as eut
+import gzip
+import heapq
 import json
 import ssl
 import sys
-import time
-import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Iterable, List, Optional, Tuple
+from functools import lru_cache
+from io import BytesIO
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
 from urllib.parse import urlparse
+from urllib.error import HTTPError
 from urllib.request import Request, urlopen
 
+try:  # 可选依赖：安装 lxml 后使用 libxml2 解析，速度更快且能容错处理不规范的 feed
+    from lxml import etree as ET
+
+    _LXML = True
+except ImportError:  # pragma: no cover - 取决于运行环境
+    import xml.etree.ElementTree as ET
+
+    _LXML = False
+
+try:  # 可选依赖：安装 requests 后复用 HTTP 连接池（keep-alive），同一主机免去重复的 TCP/TLS 握手
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:  # pragma: no cover - 取决于运行环境
+    requests = None
+
+# lxml 下：只为 item/entry（任意命名空间）产生事件，由 C 层完成标签过滤；
+# 跳过注释/处理指令节点（其 tag 不是字符串），并开启 recover 容错。
+# 解析的是不可信的网络内容：只展开文档内声明的内部实体，不读取 file:// 等外部实体
+# （lxml 5.0 之前没有 "internal"，退回为完全不展开），禁止联网加载外部 DTD，
+# 保留 libxml2 的深度与大小限制。
+# 未展开的实体会以 Entity 节点出现在子节点中（tag 不是字符串），遍历时需跳过。
+# 标准库 expat（2.4.1+）自带实体膨胀防护，且不会加载外部实体。
+_ITERPARSE_KW: dict = (
+    {
+        "tag": ("{*}item", "{*}entry"),
+        "recover": True,
+        "remove_comments": True,
+        "remove_pis": True,
+        "resolve_entities": "internal" if ET.LXML_VERSION >= (5, 0) else False,
+        "no_network": True,
+        "huge_tree": False,
+    }
+    if _LXML
+    else {}
+)
+
 # 一些内置示例源，便于开箱即用。建议复制到项目根目录的 sources.json 后自行增删。
 DEFAULT_SOURCES: Dict[str, list[str]] = {
     "deals": [
@@ -53,49 +94,113 @@ class FeedItem:
     guid: Optional[str] = None
 
 
-def _local(tag: str) -> str:
-    return tag.split("}", 1)[-1]
+# 条目构造器的返回类型（默认 FeedItem；入库时直接构造数据库行元组）
+T = TypeVar("T")
 
 
-def _child_text(el: ET.Element, names: Iterable[str]) -> Optional[str]:
-    for child in el:
-        name = _local(child.tag)
-        if name in names:
-            text = (child.text or "").strip()
-            # Atom 的 link 在属性里
-            if name == "link":
-                href = child.attrib.get("href")
-                if href:
-                    return href.strip()
-            return text or None
-    return None
+@lru_cache(maxsize=256)
+def _local(tag: str) -> str:
+    return tag.rpartition("}")[2]
 
 
-def _parse_date(value: Optional[str]) -> Optional[datetime]:
-    if not value:
+def _text(el: Optional[ET.Element]) -> Optional[str]:
+    if el is None:
         return None
-    # RSS: RFC 822/1123（email.utils）; Atom: ISO-8601
+    text = el.text or ""
+    if _LXML and len(el):
+        # 未展开的实体是文本中间的子节点，其后的文本在节点的 tail 上，拼回去以免截断
+        text += "".join(c.tail or "" for c in el if not isinstance(c.tag, str))
+    return text.strip() or None
+
+
+# 同一字段的多个候选标签（按文档顺序取第一个出现的）
+_FIELD_ALIASES = {
+    "id": "guid",
+    "description": "summary",
+    "content": "summary",
+    "encoded": "summary",
+}
+
+# 常见 RSS/Atom 命名空间下条目字段的完整标签名 -> 字段名，导入时生成；
+# 命中时直接查表，省去逐个子节点的字符串切分
+_KNOWN_NS = (
+    "",  # RSS 2.0
+    "http://www.w3.org/2005/Atom",
+    "http://purl.org/atom/ns#",  # Atom 0.3
+    "http://purl.org/rss/1.0/",
+    "http://purl.org/rss/1.0/modules/content/",
+    "http://purl.org/dc/elements/1.1/",
+)
+_ITEM_FIELDS = (
+    "title", "link", "guid", "id", "summary", "description",
+    "content", "encoded", "published", "updated", "pubDate",
+)
+_TAG_FIELDS: Dict[str, str] = {
+    (f"{{{ns}}}{name}" if ns else name): _FIELD_ALIASES.get(name, name)
+    for ns in _KNOWN_NS
+    for name in _ITEM_FIELDS
+}
+
+
+@lru_cache(maxsize=512)
+def _tag_field(tag: str) -> str:
+    # 未知命名空间或无关标签（category、dc:creator 等）：按本地名匹配，结果缓存
+    name = tag.rpartition("}")[2]
+    return _FIELD_ALIASES.get(name, name)
+
+
+def _parse_rfc822(value: str) -> Optional[datetime]:
     try:
         dt = eut.parsedate_to_datetime(value)
-        if dt and dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt
-    except Exception:
-        pass
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if dt and dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _parse_iso(value: str) -> Optional[datetime]:
     try:
-        s = value.strip().replace("Z", "+00:00")
-        dt = datetime.fromisoformat(s)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt
-    except Exception:
+        dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except (ValueError, OverflowError):
         return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    """解析 RSS/Atom 日期，返回值总是带时区（缺省视为 UTC）。
+
+    结果按原始字符串缓存：同一 feed 多次轮询、多条目共用时间戳时可直接命中。
+    """
+    if not value:
+        return None
+    # RSS: RFC 822/1123（email.utils）; Atom: ISO-8601
+    # 按内容选择解析器：ISO 以 "YYYY-" 开头。不依赖标签名，因为不少 RSS 的 pubDate 也写成 ISO；
+    # 首选解析器失败时才尝试另一种，常见输入不再走“抛异常再兜底”的路径。
+    v = value.lstrip()
+    if v[:4].isdigit() and v[4:5] == "-":
+        return _parse_iso(value) or _parse_rfc822(value)
+    return _parse_rfc822(value) or _parse_iso(value)
 
 
 # ------------- 抓取与解析 -------------
 
 _UA = "litepy/0.2 (+https://example.com)"
 
+# 进程内共享：urllib 路径复用同一个 SSLContext，requests 路径复用同一个连接池
+_SSL_CTX = ssl.create_default_context()
+_SESSION = None
+if requests is not None:
+    _SESSION = requests.Session()
+    _adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+    _SESSION.mount("http://", _adapter)
+    _SESSION.mount("https://", _adapter)
+    # 进程退出时关闭池中的 keep-alive 连接
+    atexit.register(_SESSION.close)
+
 
 def fetch_url(
     url: str,
@@ -112,20 +217,35 @@ def fetch_url(
     headers = {
         "User-Agent": _UA,
         "Accept": "application/rss+xml, application/atom+xml, text/xml;q=0.9, */*;q=0.8",
+        # XML 文本压缩比高，gzip 传输可显著减少下载量（requests 会自动解压）
+        "Accept-Encoding": "gzip",
     }
     if etag:
         headers["If-None-Match"] = etag
     if last_modified:
         headers["If-Modified-Since"] = last_modified
 
-    req = Request(url, headers=headers, method="GET")
-    ctx = ssl.create_default_context()
     try:
-        with urlopen(req, timeout=timeout, context=ctx) as resp:
+        if _SESSION is not None:
+            resp = _SESSION.get(url, headers=headers, timeout=timeout)
+            # 与 urlopen 保持一致：4xx/5xx 抛出异常
+            resp.raise_for_status()
+            hdrs = {k.title(): v for k, v in resp.headers.items()}
+            return resp.status_code, (None if resp.status_code == 304 else resp.content), hdrs
+        req = Request(url, headers=headers, method="GET")
+        with urlopen(req, timeout=timeout, context=_SSL_CTX) as resp:
             status = getattr(resp, "status", 200)
             data = resp.read()
+            if resp.headers.get("Content-Encoding", "").lower() == "gzip":
+                data = gzip.decompress(data)
             hdrs = {k.title(): v for k, v in resp.headers.items()}
             return status, data, hdrs
+    except HTTPError as exc:
+        # urllib 把 304 当作错误抛出，这里还原为正常的“未修改”结果
+        if exc.code == 304:
+            return 304, None, {k.title(): v for k, v in exc.headers.items()}
+        print(f"[warn] 抓取失败: {url} -> {exc}", file=sys.stderr)
+        raise
     except Exception as exc:  # noqa: BLE001
         print(f"[warn] 抓取失败: {url} -> {exc}", file=sys.stderr)
         raise
@@ -139,32 +259,31 @@ def fetch_url_bytes(url: str, timeout: int = 15) -> bytes:
     return body or b""
 
 
-def parse_feed_meta(xml_bytes: bytes, feed_url: str) -> Tuple[Optional[str], Optional[str]]:
-    """解析 feed 的标题与站点链接。"""
-    try:
-        root = ET.fromstring(xml_bytes)
-    except Exception as exc:  # noqa: BLE001
-        print(f"[warn] 解析 XML 失败: {feed_url} -> {exc}", file=sys.stderr)
-        return None, None
-
+def _feed_meta_from_root(root: Optional[ET.Element]) -> Tuple[Optional[str], Optional[str]]:
     title: Optional[str] = None
     site_link: Optional[str] = None
+    if root is None:  # lxml recover 模式下可能解析不出根节点
+        return title, site_link
 
     # RSS 2.0: <rss><channel><title>, <link>
-    ch = next((c for c in root if _local(c.tag) == "channel"), None)
+    ch = next((c for c in root if isinstance(c.tag, str) and _local(c.tag) == "channel"), None)
     if ch is not None:
         for c in ch:
+            if not isinstance(c.tag, str):
+                continue
             nm = _local(c.tag)
             if nm == "title" and not title:
-                title = (c.text or "").strip() or None
+                title = _text(c)
             elif nm == "link" and not site_link:
-                site_link = (c.text or "").strip() or None
+                site_link = _text(c)
     else:
         # Atom: <feed><title>, <link rel="alternate" href="...">
         for c in root:
+            if not isinstance(c.tag, str):
+                continue
             nm = _local(c.tag)
             if nm == "title" and not title:
-                title = (c.text or "").strip() or None
+                title = _text(c)
             elif nm == "link":
                 href = c.attrib.get("href")
                 rel = c.attrib.get("rel", "alternate")
@@ -174,71 +293,135 @@ def parse_feed_meta(xml_bytes: bytes, feed_url: str) -> Tuple[Optional[str], Opt
     return title, site_link
 
 
-def parse_feed(xml_bytes: bytes, feed_url: str) -> List[FeedItem]:
+def parse_feed_meta(xml_bytes: bytes, feed_url: str) -> Tuple[Optional[str], Optional[str]]:
+    """保留原有 API：仅返回 feed 的标题与站点链接。"""
+    title, site_link, _ = parse_feed_full(xml_bytes, feed_url)
+    return title, site_link
+
+
+def parse_feed(xml_bytes: bytes, feed_url: str, cutoff: Optional[datetime] = None) -> List[FeedItem]:
     """保留原有 API：仅返回条目列表。"""
-    _, _, items = parse_feed_full(xml_bytes, feed_url)
+    _, _, items = parse_feed_full(xml_bytes, feed_url, cutoff=cutoff)
     return items
 
 
-def parse_feed_full(xml_bytes: bytes, feed_url: str) -> Tuple[Optional[str], Optional[str], List[FeedItem]]:
+def _item_from_node(
+    node: ET.Element,
+    src: str,
+    cutoff: Optional[datetime] = None,
+    make: Callable[..., T] = FeedItem,
+) -> Optional[T]:
+    # 单次遍历子节点：每个字段只记录第一个出现的元素；
+    # link 同时记下首个、末个与首个带 href 的 alternate，供 RSS/Atom 两种写法选择
+    fields: Dict[str, ET.Element] = {}
+    first_link = last_link = alt_link = None
+    for c in node:
+        tag = c.tag
+        if not isinstance(tag, str):  # lxml 未展开的实体节点
+            continue
+        name = _TAG_FIELDS.get(tag) or _tag_field(tag)
+        if name == "link":
+            if first_link is None:
+                first_link = c
+            last_link = c
+            if alt_link is None and c.get("href") and c.get("rel", "alternate") == "alternate":
+                alt_link = c
+        else:
+            fields.setdefault(name, c)
+
+    pub = _text(fields.get("published")) or _text(fields.get("updated")) or _text(fields.get("pubDate"))
+    published = _parse_date(pub)
+    # 早于时间窗口的条目直接跳过，不再提取其余字段
+    if cutoff is not None and published is not None and published < cutoff:
+        return None
+
+    title = _text(fields.get("title")) or ""
+    # RSS: <guid> 或 Atom: <id>
+    guid = _text(fields.get("guid"))
+    # 链接：RSS <link>text</link>  Atom <link href>
+    link = None
+    if last_link is not None:
+        last_href = last_link.get("href")
+        if last_href:
+            link = alt_link.get("href") if alt_link is not None else last_href
+        else:
+            href = first_link.get("href")
+            link = href.strip() if href else _text(first_link)
+
+    summary = _text(fields.get("summary"))
+
+    if not title and not link:
+        return None
+    # make 的参数顺序与 FeedItem 字段一致：title, link, published, source, summary, guid
+    return make(title or link or "(无标题)", link or "", published, src, summary, guid)
+
+
+def parse_feed_full(
+    xml_bytes: bytes,
+    feed_url: str,
+    cutoff: Optional[datetime] = None,
+) -> Tuple[Optional[str], Optional[str], List[FeedItem]]:
+    """流式解析 feed，返回 (feed 标题, 站点链接, 条目列表)。
+
+    使用 iterparse 逐个处理 item/entry 并在提取后清空元素，峰值内存约为单个条目大小；
+    feed 级元数据在同一次解析结束后从剩余的根节点读取，无需再次解析。
+    给定 cutoff（带时区）时，发布时间早于它的条目不会生成；无发布时间的条目保留。
+    """
+    if not xml_bytes:
+        return None, None, []
     try:
-        root = ET.fromstring(xml_bytes)
+        return _parse_feed(xml_bytes, feed_url, cutoff, FeedItem)
     except Exception as exc:  # noqa: BLE001
         print(f"[warn] 解析 XML 失败: {feed_url} -> {exc}", file=sys.stderr)
         return None, None, []
 
-    items: List[FeedItem] = []
-    nodes = [el for el in root.iter() if _local(el.tag) in ("item", "entry")]
-    src = urlparse(feed_url).netloc or feed_url
 
-    for node in nodes:
-        local = {(_local(c.tag)): c for c in list(node)}
-        title = (_child_text(node, ("title",)) or "").strip()
-        link = None
-        guid = None
-        # RSS: <guid> 或 Atom: <id>
-        guid = _child_text(node, ("guid", "id"))
-        # 链接：RSS <link>text</link>  Atom <link href>
-        if "link" in local and local["link"].attrib.get("href"):
-            links = [c for c in node if _local(c.tag) == "link"]
-            alt = next((c for c in links if c.attrib.get("rel", "alternate") == "alternate" and c.attrib.get("href")), None)
-            link = (alt.attrib.get("href") if alt is not None else local["link"].attrib.get("href"))
-        else:
-            link = _child_text(node, ("link",))
+def _parse_feed(
+    xml_bytes: bytes,
+    feed_url: str,
+    cutoff: Optional[datetime],
+    make: Callable[..., T],
+) -> Tuple[Optional[str], Optional[str], List[T]]:
+    # 解析失败时抛出异常，由调用方决定告警与后续处理
+    # 开头一段里都没有 "<" 的内容（JSON、纯文本错误页等）不可能是 feed，免去一次注定失败的解析
+    if b"<" not in xml_bytes[:256]:
+        raise ValueError("内容不是 XML")
 
-        summary = _child_text(node, ("summary", "description", "content", "encoded"))
-        pub = (
-            _child_text(node, ("published",))
-            or _child_text(node, ("updated",))
-            or _child_text(node, ("pubDate",))
-        )
-        published = _parse_date(pub)
-
-        if not title and not link:
-            continue
-        items.append(
-            FeedItem(
-                title=title or link or "(无标题)",
-                link=link or "",
-                published=published,
-                source=src,
-                summary=summary,
-                guid=guid,
-            )
-        )
-
-    # 解析 feed 级别元数据
-    feed_title, site_link = parse_feed_meta(xml_bytes, feed_url)
+    items: List[T] = []
+    src = urlparse(feed_url).netloc or feed_url
+    it = ET.iterparse(BytesIO(xml_bytes), events=("end",), **_ITERPARSE_KW)
+    done = None  # lxml：上一个已处理、已清空的条目
+    for _, el in it:
+        if _LXML or _local(el.tag) in ("item", "entry"):
+            item = _item_from_node(el, src, cutoff, make)
+            if item is not None:
+                items.append(item)
+            el.clear()
+            if _LXML:
+                # 从树上摘掉上一个条目的空壳，避免父节点下堆积成千上万个空元素；
+                # 只删除已处理的前序兄弟（lxml 文档推荐的做法），channel/feed 级元数据保持不动
+                if done is not None:
+                    parent = done.getparent()
+                    if parent is not None:
+                        parent.remove(done)
+                done = el
+
+    feed_title, site_link = _feed_meta_from_root(it.root)
     return feed_title, site_link, items
 
 
 # ------------- 旧版聚合（文件源） -------------
 
+# 并发抓取的最大线程数
+_MAX_WORKERS = 16
+
+
 def aggregate(
     sources: Dict[str, list[str]],
     category: Optional[str] = None,
     since_hours: Optional[int] = None,
     limit: Optional[int] = None,
+    max_workers: int = _MAX_WORKERS,
 ) -> List[FeedItem]:
     # 选择要抓取的 URL 列表
     cats = [category] if category else list(sources.keys())
@@ -246,40 +429,42 @@ def aggregate(
     for c in cats:
         urls.extend(sources.get(c, []))
 
-    seen: set[str] = set()
-    items: List[FeedItem] = []
-
-    for url in urls:
-        try:
-            data = fetch_url_bytes(url)
-            parsed = parse_feed(data, url)
-            for it in parsed:
-                key = it.link or f"{it.title}|{it.published}"
-                if key in seen:
-                    continue
-                seen.add(key)
-                items.append(it)
-        except Exception as exc:  # noqa: BLE001
-            print(f"[warn] 抓取失败: {url} -> {exc}", file=sys.stderr)
-            continue
+    # 时间窗口在解析时直接应用，过旧的条目不会生成 FeedItem
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=since_hours) if since_hours else None
 
-    # 过滤时间窗口
-    if since_hours:
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=since_hours)
-        items = [i for i in items if (i.published is None or i.published >= cutoff)]
+    # 并发抓取（I/O 密集，socket 读取时释放 GIL）；先完成的先在当前线程解析，与其余抓取重叠
+    parsed_by_url: List[List[FeedItem]] = [[] for _ in urls]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as ex:
+        futures = {ex.submit(fetch_url_bytes, url): idx for idx, url in enumerate(urls)}
+        for fut in as_completed(futures):
+            idx = futures[fut]
+            url = urls[idx]
+            try:
+                parsed_by_url[idx] = parse_feed(fut.result(), url, cutoff=cutoff)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[warn] 抓取失败: {url} -> {exc}", file=sys.stderr)
 
-    # 排序：有发布时间的倒序，无发布时间的置后
+    # 按源顺序去重，结果不受抓取完成顺序影响；元组做键，无需逐条格式化字符串
+    seen: set[tuple] = set()
+    seen_add = seen.add
+    items: List[FeedItem] = []
+    items_append = items.append
+    for parsed in parsed_by_url:
+        for it in parsed:
+            key = (it.link,) if it.link else (None, it.title, it.published)
+            if key in seen:
+                continue
+            seen_add(key)
+            items_append(it)
+
+    # 排序：有发布时间的倒序，无发布时间的置后（_parse_date 返回值总是带时区）
+    # key 对每个条目只计算一次；有 limit 时只需前 N 条，用堆选取代替全量排序
     def sort_key(it: FeedItem):
-        ts = it.published.timestamp() if (it.published and it.published.tzinfo) else (
-            it.published.replace(tzinfo=timezone.utc).timestamp() if it.published else -1
-        )
-        return (0 if it.published else 1, -ts)
-
-    items.sort(key=sort_key)
+        return (0, -it.published.timestamp()) if it.published else (1, 0)
 
     if limit:
-        items = items[:limit]
-
+        return heapq.nsmallest(limit, items, key=sort_key)
+    items.sort(key=sort_key)
     return items
 
 
@@ -320,57 +505,149 @@ def _iso_now() -> str:
     return datetime.utcnow().replace(microsecond=0).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
+def _db_time(dt: Optional[datetime]) -> Optional[str]:
+    # 统一存为 UTC，保证 published 字符串可直接按时间比较与排序
+    return dt.astimezone(timezone.utc).replace(microsecond=0).isoformat() if dt else None
+
+
 def crawl_into_db(db_conn) -> int:
     """抓取数据库中的所有活跃源，写入 items，返回新增或更新的条目数。"""
     from . import store  # 本地导入，避免循环依赖
 
     feeds = store.list_feeds(db_conn, active_only=True)
     total_updates = 0
-    for f in feeds:
-        try:
-            status, body, hdrs = fetch_url(f.url, etag=f.etag, last_modified=f.last_modified)
-        except Exception:
-            continue
-        # 304 Not Modified
-        if status == 304:
+    if not feeds:
+        return total_updates
+    # 网络请求在线程池中并发进行；解析与写库留在当前线程（sqlite3 连接不可跨线程共享）
+    with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(feeds))) as ex:
+        futures = {
+            ex.submit(fetch_url, f.url, etag=f.etag, last_modified=f.last_modified): f
+            for f in feeds
+        }
+        for fut in as_completed(futures):
+            f = futures[fut]
+            try:
+                status, body, hdrs = fut.result()
+            except Exception:
+                continue
+            # 304 Not Modified：跳过解析，仅刷新检查时间（服务器若下发了新的校验值也一并保存）
+            if status == 304:
+                store.update_feed_meta(
+                    db_conn,
+                    f.id,
+                    etag=hdrs.get("Etag"),
+                    last_modified=hdrs.get("Last-Modified"),
+                    last_checked_iso=_iso_now(),
+                )
+                continue
+            if status != 200 or not body:
+                store.update_feed_meta(db_conn, f.id, last_checked_iso=_iso_now())
+                continue
+            # 解析 feed
+            feed_title, site_link, items = parse_feed_full(body, f.url)
+            # 更新 feed 元信息与缓存
             store.update_feed_meta(
                 db_conn,
                 f.id,
+                title=feed_title,
+                site_link=site_link,
+                etag=hdrs.get("Etag"),
+                last_modified=hdrs.get("Last-Modified"),
                 last_checked_iso=_iso_now(),
             )
-            continue
-        if status != 200 or not body:
-            store.update_feed_meta(db_conn, f.id, last_checked_iso=_iso_now())
-            continue
-        # 解析 feed
-        feed_title, site_link, items = parse_feed_full(body, f.url)
-        # 更新 feed 元信息与缓存
-        store.update_feed_meta(
-            db_conn,
-            f.id,
-            title=feed_title,
-            site_link=site_link,
-            etag=hdrs.get("Etag"),
-            last_modified=hdrs.get("Last-Modified"),
-            last_checked_iso=_iso_now(),
-        )
-        # 写入条目
-        before = time.time()
-        for it in items:
-            pub_iso = it.published.replace(microsecond=0).isoformat() if it.published else None
-            store.upsert_item(
+            # 写入条目（每个源一个事务）
+            store.upsert_items_batch(
                 db_conn,
                 f.id,
-                link=it.link,
-                title=it.title,
-                summary=it.summary,
-                published_iso=pub_iso,
-                guid=it.guid,
+                [
+                    (
+                        it.guid,
+                        it.title,
+                        it.link,
+                        it.summary,
+                        _db_time(it.published),
+                    )
+                    for it in items
+                ],
             )
-        total_updates += len(items)
+            total_updates += len(items)
     return total_updates
 
 
+def _db_row(title, link, published, source, summary, guid) -> tuple:
+    # 与 upsert_items_batch 的行格式一致：(guid, title, link, summary, published_iso)
+    return (guid, title, link, summary, _db_time(published))
+
+
+def aggregate_to_store(
+    db_conn,
+    sources: Dict[str, list[str]],
+    category: Optional[str] = None,
+    since_hours: Optional[int] = None,
+    max_workers: int = _MAX_WORKERS,
+) -> int:
+    """抓取文件源并直接写入数据库，返回写入的条目数。
+
+    解析结果直接生成数据库行元组而不构造 FeedItem，所有源的条目最后一次 executemany 写入，
+    与新源登记、元数据更新在同一个事务中提交。
+    库中已停用的源跳过，已有源保留原分类；新 URL 只在抓取并解析成功后才登记为订阅源。
+    """
+    from . import store
+
+    known = {f.url: f for f in store.list_feeds(db_conn, active_only=False)}
+    cats = [category] if category else list(sources.keys())
+    url_cats: Dict[str, Optional[str]] = {}
+    for c in cats:
+        for url in sources.get(c, []):
+            f = known.get(url)
+            if f is not None and not f.active:
+                continue
+            url_cats.setdefault(url, c)
+    if not url_cats:
+        return 0
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=since_hours) if since_hours else None
+    parsed: Dict[str, Tuple[Optional[str], Optional[str], List[tuple]]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(url_cats)))) as ex:
+        futures = {ex.submit(fetch_url_bytes, url): url for url in url_cats}
+        for fut in as_completed(futures):
+            url = futures[fut]
+            try:
+                body = fut.result()
+            except Exception as exc:  # noqa: BLE001
+                print(f"[warn] 抓取失败: {url} -> {exc}", file=sys.stderr)
+                continue
+            if not body:
+                continue
+            try:
+                parsed[url] = _parse_feed(body, url, cutoff, _db_row)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[warn] 解析 XML 失败: {url} -> {exc}", file=sys.stderr)
+
+    # 登记新源、更新元数据与写入条目在同一个事务中提交，任何一步失败都整体回滚；
+    # 按源文件顺序处理，新源的 id 分配不受抓取完成先后影响
+    rows: List[tuple] = []
+    checked = _iso_now()
+    with db_conn:
+        for url, cat in url_cats.items():
+            if url not in parsed:
+                continue
+            feed_title, site_link, feed_rows = parsed[url]
+            f = known.get(url)
+            feed_id = f.id if f is not None else store.add_feed(db_conn, url, cat, commit=False)
+            store.update_feed_meta(
+                db_conn,
+                feed_id,
+                title=feed_title,
+                site_link=site_link,
+                last_checked_iso=checked,
+                commit=False,
+            )
+            rows.extend((feed_id, *r) for r in feed_rows)
+        store.upsert_items_bulk(db_conn, rows)
+    return len(rows)
+
+
 def export_items_from_db(
     db_conn,
     *,
@@ -383,7 +660,8 @@ def export_items_from_db(
     feeds = store.list_feeds(db_conn, active_only=True)
     id_map = {f.id: f for f in feeds}
     results: List[FeedItem] = []
-    for row in store.iter_items(db_conn, feed_ids=feed_ids, since_hours=since_hours, limit=limit):
+    since_iso = store.utc_cutoff_iso(since_hours) if since_hours else None
+    for row in store.iter_items(db_conn, feed_ids=feed_ids, since_iso=since_iso, limit=limit):
         feed = id_map.get(row.feed_id)
         src = None
         if feed and feed.title:
@@ -392,14 +670,16 @@ def export_items_from_db(
             src = urlparse(feed.url).netloc
         else:
             src = "unknown"
+        # published 由 crawl_into_db 以 isoformat 写入，时间窗口已在 SQL 中过滤；
+        # upsert_item 是公开接口，库里仍可能有非 ISO 的值，解析失败按无时间处理
         dt = None
         if row.published:
             try:
                 dt = datetime.fromisoformat(row.published)
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-            except Exception:
+            except ValueError:
                 dt = None
+            if dt is not None and dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
         results.append(
             FeedItem(
                 title=row.title or row.link,
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import os
 import sqlite3
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime, timedelta, timezone
 from typing import Iterable, List, Optional, Sequence
 
@@ -32,6 +32,10 @@ class ItemRow:
     guid: Optional[str]
 
 
+# SELECT 列表由 dataclass 字段生成，保证列顺序与字段顺序一致，可直接按位置构造行对象
+_FEED_COLUMNS = ", ".join(f.name for f in fields(FeedRow))
+_ITEM_COLUMNS = ", ".join(f.name for f in fields(ItemRow))
+
 DEFAULT_DB_PATH = os.path.join("data", "feeds.db")
 
 
@@ -41,10 +45,29 @@ def ensure_dir(path: str) -> None:
         os.makedirs(d, exist_ok=True)
 
 
+def utc_cutoff_iso(hours: int) -> str:
+    """返回 N 小时前的 UTC 时间（ISO-8601，秒精度），用于 published 字符串比较。"""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+    return cutoff.replace(microsecond=0).isoformat()
+
+
 def get_conn(db_path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
     ensure_dir(db_path)
+    is_new = not os.path.exists(db_path) or os.path.getsize(db_path) == 0
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
+    if is_new:
+        # 页大小只能在建库（及切换 WAL）之前设置；8 KiB 页让 B 树更浅
+        conn.execute("PRAGMA page_size=8192")
+    # WAL + NORMAL：写入不再每次提交都 fsync 主库文件，崩溃时最多丢失最后一个事务
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # 临时表/排序放内存，页缓存上限约 64 MiB（负数单位为 KiB）
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    # 读查询直接映射数据库文件，省去拷贝到页缓存；上限 256 MiB 只占虚拟地址空间，
+    # 实际驻留内存取决于被访问的页，并与操作系统页缓存共享
+    conn.execute("PRAGMA mmap_size=268435456")
     return conn
 
 
@@ -82,11 +105,76 @@ def init_db(conn: sqlite3.Connection) -> None:
         )
         """
     )
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_items_published ON items(published DESC)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_items_feed ON items(feed_id)")
+    # 索引列与 iter_items 的 ORDER BY published DESC, id DESC 一致，排序可直接走索引而无需临时 B 树；
+    # 按源过滤时用 (feed_id, ...) 复合索引。旧版的单列索引被这两个覆盖，升级时删除。
+    cur.execute("DROP INDEX IF EXISTS idx_items_published")
+    cur.execute("DROP INDEX IF EXISTS idx_items_feed")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_items_pub_id ON items(published DESC, id DESC)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_items_feed_pub ON items(feed_id, published DESC, id DESC)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_feeds_category_active ON feeds(category, active)")
+    _init_fts(cur)
+    _migrate_published_utc(cur)
     conn.commit()
 
 
+def _migrate_published_utc(cur: sqlite3.Cursor) -> None:
+    """把旧版按原始时区偏移写入的 published 统一为 UTC（只执行一次，以 user_version 记录）。
+
+    iter_items 按字符串比较/排序 published，混有 +08:00 等偏移的旧数据会排错、筛错；
+    已不在任何 feed 中的旧条目不会被重新抓取覆盖，因此在升级时就地改写。无法解析的值保持不变。
+    """
+    cur.execute("PRAGMA user_version")
+    if cur.fetchone()[0] >= 1:
+        return
+    cur.execute(
+        """
+        UPDATE items SET published = strftime('%Y-%m-%dT%H:%M:%S+00:00', published)
+        WHERE published NOT LIKE '%+00:00'
+          AND strftime('%Y-%m-%dT%H:%M:%S+00:00', published) IS NOT NULL
+        """
+    )
+    cur.execute("PRAGMA user_version=1")
+
+
+def _init_fts(cur: sqlite3.Cursor) -> None:
+    """创建 items 的 FTS5 全文索引（trigram 分词，支持中文子串匹配）及同步触发器。
+
+    需要 SQLite 3.34+ 且编译了 FTS5；不可用时静默跳过，搜索退回 LIKE。
+    """
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='items_fts'")
+    if cur.fetchone():
+        return
+    try:
+        cur.execute(
+            "CREATE VIRTUAL TABLE items_fts USING fts5("
+            "title, summary, content='items', content_rowid='id', tokenize='trigram')"
+        )
+    except sqlite3.OperationalError:
+        return
+    cur.executescript(
+        """
+        CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+        END;
+        CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN
+            INSERT INTO items_fts(items_fts, rowid, title, summary) VALUES ('delete', old.id, old.title, old.summary);
+        END;
+        CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE OF title, summary ON items
+        WHEN old.title IS NOT new.title OR old.summary IS NOT new.summary BEGIN
+            INSERT INTO items_fts(items_fts, rowid, title, summary) VALUES ('delete', old.id, old.title, old.summary);
+            INSERT INTO items_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+        END;
+        INSERT INTO items_fts(items_fts) VALUES ('rebuild');
+        """
+    )
+
+
+def _has_fts(conn: sqlite3.Connection) -> bool:
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='items_fts'")
+    return cur.fetchone() is not None
+
+
 def ensure_seed_builtin(conn: sqlite3.Connection, sources: dict[str, list[str]]) -> None:
     cur = conn.cursor()
     # Check if any feeds exist
@@ -95,16 +183,21 @@ def ensure_seed_builtin(conn: sqlite3.Connection, sources: dict[str, list[str]])
     if count and count > 0:
         return
     # Seed builtins
-    for category, urls in sources.items():
-        for url in urls:
-            cur.execute(
-                "INSERT OR IGNORE INTO feeds(url, category, is_builtin, active) VALUES (?, ?, 1, 1)",
-                (url, category),
-            )
+    cur.executemany(
+        "INSERT OR IGNORE INTO feeds(url, category, is_builtin, active) VALUES (?, ?, 1, 1)",
+        [(url, category) for category, urls in sources.items() for url in urls],
+    )
     conn.commit()
 
 
-def add_feed(conn: sqlite3.Connection, url: str, category: Optional[str] = None, is_builtin: bool = False) -> int:
+def add_feed(
+    conn: sqlite3.Connection,
+    url: str,
+    category: Optional[str] = None,
+    is_builtin: bool = False,
+    *,
+    commit: bool = True,
+) -> int:
     cur = conn.cursor()
     cur.execute(
         "INSERT OR IGNORE INTO feeds(url, category, is_builtin, active) VALUES (?, ?, ?, 1)",
@@ -113,7 +206,8 @@ def add_feed(conn: sqlite3.Connection, url: str, category: Optional[str] = None,
     # If existed, update category if provided
     if cur.rowcount == 0 and category is not None:
         cur.execute("UPDATE feeds SET category=? WHERE url=?", (category, url))
-    conn.commit()
+    if commit:
+        conn.commit()
     cur.execute("SELECT id FROM feeds WHERE url=?", (url,))
     row = cur.fetchone()
     return int(row[0])
@@ -121,13 +215,22 @@ def add_feed(conn: sqlite3.Connection, url: str, category: Optional[str] = None,
 
 def list_feeds(conn: sqlite3.Connection, active_only: bool = True) -> list[FeedRow]:
     cur = conn.cursor()
-    sql = "SELECT id, url, category, title, site_link, is_builtin, active, etag, last_modified, last_checked_at FROM feeds"
+    sql = f"SELECT {_FEED_COLUMNS} FROM feeds"
     if active_only:
         sql += " WHERE active=1"
     sql += " ORDER BY COALESCE(category, '') ASC, url ASC"
     cur.execute(sql)
     rows = cur.fetchall()
-    return [FeedRow(**dict(r)) for r in rows]
+    return [FeedRow(*r) for r in rows]
+
+
+def list_feed_ids_by_category(conn: sqlite3.Connection, category: str, active_only: bool = True) -> list[int]:
+    sql = "SELECT id FROM feeds WHERE category=?"
+    if active_only:
+        sql += " AND active=1"
+    cur = conn.cursor()
+    cur.execute(sql, (category,))
+    return [r[0] for r in cur.fetchall()]
 
 
 def update_feed_meta(
@@ -139,6 +242,7 @@ def update_feed_meta(
     etag: Optional[str] = None,
     last_modified: Optional[str] = None,
     last_checked_iso: Optional[str] = None,
+    commit: bool = True,
 ) -> None:
     sets: list[str] = []
     vals: list[object] = []
@@ -163,7 +267,18 @@ def update_feed_meta(
     sql = f"UPDATE feeds SET {', '.join(sets)} WHERE id=?"
     cur = conn.cursor()
     cur.execute(sql, tuple(vals))
-    conn.commit()
+    if commit:
+        conn.commit()
+
+
+_UPSERT_ITEM_SQL = """
+    INSERT INTO items(feed_id, guid, title, link, summary, published)
+    VALUES(?, ?, ?, ?, ?, ?)
+    ON CONFLICT(feed_id, link) DO UPDATE SET
+        title=excluded.title,
+        summary=excluded.summary,
+        published=excluded.published
+"""
 
 
 def upsert_item(
@@ -177,17 +292,32 @@ def upsert_item(
     guid: Optional[str] = None,
 ) -> None:
     cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO items(feed_id, guid, title, link, summary, published)
-        VALUES(?, ?, ?, ?, ?, ?)
-        ON CONFLICT(feed_id, link) DO UPDATE SET
-            title=excluded.title,
-            summary=excluded.summary,
-            published=excluded.published
-        """,
-        (feed_id, guid, title, link, summary, published_iso),
-    )
+    cur.execute(_UPSERT_ITEM_SQL, (feed_id, guid, title, link, summary, published_iso))
+    conn.commit()
+
+
+def upsert_items_batch(
+    conn: sqlite3.Connection,
+    feed_id: int,
+    rows: Iterable[tuple[Optional[str], Optional[str], str, Optional[str], Optional[str]]],
+) -> None:
+    """批量写入同一个源的条目，单个事务内 executemany。
+
+    rows 中每项为 (guid, title, link, summary, published_iso)。
+    """
+    upsert_items_bulk(conn, ((feed_id, *r) for r in rows))
+
+
+def upsert_items_bulk(
+    conn: sqlite3.Connection,
+    rows: Iterable[tuple[int, Optional[str], Optional[str], str, Optional[str], Optional[str]]],
+) -> None:
+    """批量写入任意多个源的条目：一次 executemany、一次提交。
+
+    rows 中每项为 (feed_id, guid, title, link, summary, published_iso)。
+    """
+    cur = conn.cursor()
+    cur.executemany(_UPSERT_ITEM_SQL, rows)
     conn.commit()
 
 
@@ -196,30 +326,46 @@ def iter_items(
     *,
     feed_ids: Optional[Sequence[int]] = None,
     since_hours: Optional[int] = None,
+    since_iso: Optional[str] = None,
     limit: Optional[int] = None,
     search: Optional[str] = None,
 ) -> Iterable[ItemRow]:
+    """按发布时间倒序返回条目，无发布时间的排在最后。
+
+    since_iso 为 UTC ISO-8601 字符串（与写入时的格式一致），按字符串比较；
+    since_hours 为兼容参数，会换算为 since_iso。
+    无发布时间的条目也满足时间窗口，筛选在按 published 索引顺序扫描时逐行判断，
+    而不是索引范围查找；有 limit 时扫描到足够行数即停止。
+    """
     where: list[str] = []
     vals: list[object] = []
     if feed_ids:
         where.append(f"feed_id IN ({','.join('?' for _ in feed_ids)})")
         vals.extend(feed_ids)
-    if since_hours:
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=since_hours)
+    if since_hours and not since_iso:
+        since_iso = utc_cutoff_iso(since_hours)
+    if since_iso:
         where.append("(published IS NULL OR published >= ?)")
-        vals.append(cutoff.replace(microsecond=0).isoformat())
+        vals.append(since_iso)
     if search:
-        where.append("(title LIKE ? OR summary LIKE ?)")
-        vals.extend([f"%{search}%", f"%{search}%"])
+        # trigram 至少需要 3 个字符；更短的关键词或无 FTS5 时退回全表 LIKE
+        if len(search) >= 3 and _has_fts(conn):
+            where.append("id IN (SELECT rowid FROM items_fts WHERE items_fts MATCH ?)")
+            vals.append('"' + search.replace('"', '""') + '"')
+        else:
+            where.append("(title LIKE ? OR summary LIKE ?)")
+            vals.extend([f"%{search}%", f"%{search}%"])
 
-    sql = "SELECT id, feed_id, title, link, summary, published, guid FROM items"
+    sql = f"SELECT {_ITEM_COLUMNS} FROM items"
     if where:
         sql += " WHERE " + " AND ".join(where)
-    sql += " ORDER BY COALESCE(published, '0000-01-01T00:00:00Z') DESC, id DESC"
+    # SQLite 中 NULL 最小，DESC 时自然排在最后；不包 COALESCE 才能利用 published 索引
+    sql += " ORDER BY published DESC, id DESC"
     if limit:
-        sql += f" LIMIT {int(limit)}"
+        sql += " LIMIT ?"
+        vals.append(int(limit))
 
     cur = conn.cursor()
     cur.execute(sql, tuple(vals))
     for r in cur.fetchall():
-        yield ItemRow(**dict(r))
+        yield ItemRow(*r)
@@ -0,0 +1,114 @@
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from litepy import feeds, store  # noqa: E402
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel>
+  <title>Example</title><link>https://example.com/</link>
+  <item>
+    <title>Hello</title><link>https://example.com/1</link><guid>g1</guid>
+    <description>first</description><pubDate>Tue, 10 Jun 2025 08:00:00 +0800</pubDate>
+  </item>
+  <item><title>No date</title><link>https://example.com/2</link></item>
+</channel></rss>
+"""
+
+BODIES = {
+    "https://ok.example/feed": RSS,
+    "https://moved.example/feed": RSS,
+    "https://off.example/feed": RSS,
+    "https://broken.example/feed": b"not xml at all",
+}
+
+
+def fake_fetch(url, timeout=15):
+    if url not in BODIES:
+        raise OSError("connection refused")
+    return BODIES[url]
+
+
+class AggregateToStoreTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.conn = store.get_conn(os.path.join(tmp.name, "t.db"))
+        store.init_db(self.conn)
+        self.addCleanup(self.conn.close)
+
+    def _run(self, sources, **kw):
+        with mock.patch.object(feeds, "fetch_url_bytes", fake_fetch), contextlib.redirect_stderr(io.StringIO()):
+            return feeds.aggregate_to_store(self.conn, sources, **kw)
+
+    def test_writes_rows_and_respects_existing_feeds(self):
+        moved_id = store.add_feed(self.conn, "https://moved.example/feed", "old")
+        off_id = store.add_feed(self.conn, "https://off.example/feed", "tech")
+        self.conn.execute("UPDATE feeds SET active=0 WHERE id=?", (off_id,))
+        self.conn.commit()
+
+        n = self._run(
+            {
+                "news": [
+                    "https://ok.example/feed",
+                    "https://moved.example/feed",
+                    "https://off.example/feed",
+                    "https://down.example/feed",
+                    "https://broken.example/feed",
+                ]
+            }
+        )
+        self.assertEqual(n, 4)
+
+        feeds_by_url = {f.url: f for f in store.list_feeds(self.conn, active_only=False)}
+        # 抓取或解析失败的 URL 不登记
+        self.assertEqual(
+            sorted(feeds_by_url),
+            ["https://moved.example/feed", "https://off.example/feed", "https://ok.example/feed"],
+        )
+        ok = feeds_by_url["https://ok.example/feed"]
+        self.assertEqual((ok.category, ok.title, ok.site_link), ("news", "Example", "https://example.com/"))
+        # 已有源保留原分类
+        self.assertEqual(feeds_by_url["https://moved.example/feed"].category, "old")
+
+        rows = [
+            tuple(r)
+            for r in self.conn.execute(
+                "SELECT feed_id, guid, title, link, summary, published FROM items ORDER BY feed_id, link"
+            )
+        ]
+        self.assertEqual(
+            rows,
+            [
+                (moved_id, "g1", "Hello", "https://example.com/1", "first", "2025-06-10T00:00:00+00:00"),
+                (moved_id, None, "No date", "https://example.com/2", None, None),
+                (ok.id, "g1", "Hello", "https://example.com/1", "first", "2025-06-10T00:00:00+00:00"),
+                (ok.id, None, "No date", "https://example.com/2", None, None),
+            ],
+        )
+        # 已停用的源不写入条目
+        self.assertNotIn(off_id, {r[0] for r in rows})
+
+
+    def test_failed_write_rolls_back_feed_registration(self):
+        old_id = store.add_feed(self.conn, "https://moved.example/feed", "old")
+        with mock.patch.object(store, "upsert_items_bulk", side_effect=sqlite3.OperationalError("disk I/O error")):
+            with self.assertRaises(sqlite3.OperationalError):
+                self._run({"news": ["https://ok.example/feed", "https://moved.example/feed"]})
+
+        feeds_now = store.list_feeds(self.conn, active_only=False)
+        self.assertEqual([(f.id, f.title, f.last_checked_at) for f in feeds_now], [(old_id, None, None)])
+
+    def test_zero_workers_still_fetches(self):
+        self.assertEqual(self._run({"news": ["https://ok.example/feed"]}, max_workers=0), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from litepy import feeds  # noqa: E402
+
+
+def parse(xml: bytes):
+    with contextlib.redirect_stderr(io.StringIO()):
+        return feeds.parse_feed_full(xml, "https://example.com/feed")
+
+
+class EntityTest(unittest.TestCase):
+    @unittest.skipIf(feeds._LXML and feeds.ET.LXML_VERSION < (5, 0), "lxml 5.0 之前不展开任何实体")
+    def test_declared_entity_is_expanded(self):
+        xml = b"""<?xml version="1.0"?>
+<!DOCTYPE rss [<!ENTITY foo "bar">]>
+<rss><channel><title>T &foo; x</title>
+  <item><title>a &foo; b</title><link>https://example.com/1</link></item>
+</channel></rss>
+"""
+        title, _, items = parse(xml)
+        self.assertEqual(title, "T bar x")
+        self.assertEqual([i.title for i in items], ["a bar b"])
+
+    @unittest.skipUnless(feeds._LXML, "标准库解析器遇到未声明实体时整体失败")
+    def test_undeclared_html_entity_does_not_truncate(self):
+        xml = b"""<rss version="0.91"><channel><title>Caf&eacute; opens &amp; closes</title>
+  <item><title>Caf&eacute; opens &amp; closes</title><link>https://example.com/1</link></item>
+</channel></rss>
+"""
+        title, _, items = parse(xml)
+        # libxml2 容错时会丢掉未声明的实体，其后的文本必须保留
+        for t in (title, items[0].title):
+            self.assertTrue(t.startswith("Caf"), t)
+            self.assertTrue(t.endswith("closes"), t)
+
+    def test_external_entity_is_not_loaded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            secret = os.path.join(tmp, "secret.txt")
+            with open(secret, "w") as f:
+                f.write("SECRET-LINE")
+            xml = (
+                f'<?xml version="1.0"?><!DOCTYPE rss [<!ENTITY x SYSTEM "file://{secret}">]>'
+                "<rss><channel><title>t &x;</title>"
+                "<item><title>leak: &x;</title><link>https://example.com/1</link></item>"
+                "</channel></rss>"
+            ).encode()
+            self.assertNotIn("SECRET-LINE", repr(parse(xml)))
+
+
+if __name__ == "__main__":
+    unittest.main()